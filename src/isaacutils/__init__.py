@@ -2,14 +2,31 @@
 
 __version__ = "0.2.2"
 
-from .mail import send_alert, send_html_alert, EmailHandler
-from .posts import get_post_attr, get_post_attrs
+from .mail import (
+    send_alert,
+    send_html_alert,
+    EmailHandler,
+    SMTPConnection,
+    invalidate_password_cache,
+)
+from .posts import (
+    get_post_attr,
+    get_post_attr_compiled,
+    get_post_attrs,
+    compile_post_attr_paths,
+    CompiledPaths,
+)
 
 __all__ = [
     "__version__",
     "send_alert",
     "send_html_alert",
     "EmailHandler",
+    "SMTPConnection",
+    "invalidate_password_cache",
     "get_post_attr",
     "get_post_attrs",
+    "get_post_attr_compiled",
+    "compile_post_attr_paths",
+    "CompiledPaths",
 ]
@@ -1,16 +1,255 @@
 import smtplib
 import logging
+import logging.handlers
 import threading
 import atexit
-from collections import deque
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import os
+import concurrent.futures
+import html
+import time
+import functools
+from email import policy
+from email.message import EmailMessage
 from pathlib import Path
-from datetime import datetime
 import traceback
 
 
-def send_alert(from_addr, to_addr, subject, body, pwdfile, smtp_server, smtp_port=587):
+# Errors indicating the underlying socket is unusable and should be reopened
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_password(pwdfile):
+    """Read and cache the password stored in pwdfile (relative to home directory)."""
+    return Path.home().joinpath(pwdfile).read_text().strip()
+
+
+def invalidate_password_cache():
+    """Forget cached passwords so the next send re-reads the password files.
+
+    Call this after rotating a password file while the process is running.
+    """
+    _read_password.cache_clear()
+
+
+class SMTPConnection:
+    """Persistent, authenticated SMTP connection that can be reused across sends.
+
+    The connection is opened lazily on first send and health-checked with NOOP
+    before each subsequent send; if the server has dropped it, it is
+    transparently re-established. A message is never resent once handed to
+    the server: if the session fails mid-send the error propagates (the message
+    may or may not have been delivered) and the next send reconnects. After
+    `close()`, each send uses its own session that is quit straight away, so
+    nothing is left open once the process is shutting down.
+
+    Args:
+        from_addr: Email address to send from (also used to log in)
+        pwdfile: Path to password file (relative to home directory)
+        smtp_server: SMTP server address
+        smtp_port: SMTP server port (default: 587)
+    """
+
+    def __init__(self, from_addr, pwdfile, smtp_server, smtp_port=587):
+        self.from_addr = from_addr
+        self.pwdfile = pwdfile
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+
+        self._smtp = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Open, secure, and authenticate a new SMTP session."""
+        smtp = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            smtp.starttls()
+            smtp.login(self.from_addr, _read_password(self.pwdfile))
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def _reset(self):
+        """Drop the current session without talking to the server."""
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except OSError:
+                pass
+            self._smtp = None
+
+    def _quit(self):
+        """End the current session politely, then drop it."""
+        try:
+            self._smtp.quit()
+        except _CONNECTION_ERRORS:
+            pass
+        self._reset()
+
+    def _is_alive(self):
+        """Check the current session with NOOP."""
+        try:
+            return self._smtp.noop()[0] == 250
+        except _CONNECTION_ERRORS:
+            return False
+
+    def send_message(self, msg):
+        """Send an email message, reconnecting first if the session was dropped."""
+        with self._lock:
+            if self._closed:
+                self._connect()
+                try:
+                    self._smtp.send_message(msg)
+                finally:
+                    self._quit()
+                return
+
+            if self._smtp is None or not self._is_alive():
+                self._reset()
+                self._connect()
+
+            try:
+                self._smtp.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Resending could deliver twice; just reconnect on the next send
+                self._reset()
+                raise
+
+    def close(self):
+        """Politely end the SMTP session; later sends no longer keep one open."""
+        with self._lock:
+            self._closed = True
+            if self._smtp is not None:
+                self._quit()
+
+
+class _SMTPPool:
+    """Process-wide registry of shared SMTPConnections keyed by (server, port, from_addr, pwdfile)."""
+
+    def __init__(self):
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def get(self, from_addr, pwdfile, smtp_server, smtp_port=587):
+        """Return the shared connection for these settings, creating it if needed."""
+        key = (smtp_server, smtp_port, from_addr, pwdfile)
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is None:
+                connection = SMTPConnection(from_addr, pwdfile, smtp_server, smtp_port)
+                self._connections[key] = connection
+            return connection
+
+    def close_all(self):
+        """Close every pooled connection."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+
+
+_pool = _SMTPPool()
+atexit.register(_pool.close_all)
+
+# Bounded worker pool shared by all EmailHandlers for background sends,
+# created on first use so importing the package never depends on it
+_DEFAULT_SMTP_WORKERS = 2
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _smtp_workers():
+    """Worker count from ISAACUTILS_SMTP_WORKERS, falling back to the default if invalid."""
+    try:
+        workers = int(os.environ.get("ISAACUTILS_SMTP_WORKERS", _DEFAULT_SMTP_WORKERS))
+    except ValueError:
+        return _DEFAULT_SMTP_WORKERS
+    return workers if workers > 0 else _DEFAULT_SMTP_WORKERS
+
+
+def _get_executor():
+    """Return the shared send pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_smtp_workers(),
+                thread_name_prefix="isaacutils-smtp",
+            )
+        return _executor
+
+
+# Tracebacks longer than this are clipped to their first and last lines in emails
+_MAX_STACKTRACE_CHARS = 4096
+_STACKTRACE_HEAD_LINES = 2
+_STACKTRACE_TAIL_LINES = 40
+
+
+# HTML templates for EmailHandler batches
+_HTML_HEAD = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .error-container { margin: 20px 0; padding: 15px; border-left: 4px solid #d32f2f; background: #ffebee; }
+        .critical-container { margin: 20px 0; padding: 15px; border-left: 4px solid #b71c1c; background: #ffcdd2; }
+        .error-header { font-weight: bold; color: #d32f2f; margin-bottom: 10px; }
+        .critical-header { font-weight: bold; color: #b71c1c; margin-bottom: 10px; }
+        .error-time { color: #666; font-size: 0.9em; }
+        .error-location { color: #666; font-size: 0.9em; margin: 5px 0; }
+        .error-message { margin: 10px 0; padding: 10px; background: white; border-radius: 4px; }
+        .stacktrace { background: #263238; color: #aed581; padding: 15px; border-radius: 4px;
+                     overflow-x: auto; font-family: 'Courier New', monospace; font-size: 0.85em;
+                     white-space: pre-wrap; word-wrap: break-word; }
+        .summary { background: #e3f2fd; padding: 15px; border-radius: 4px; margin-bottom: 20px; }
+    </style>
+</head>
+<body>
+"""
+
+_HTML_SUMMARY = """
+<div class="summary">
+    <strong>Summary:</strong> {count} error(s) occurred{unique}<br>
+    <strong>Time Range:</strong> {start} - {end}
+</div>
+"""
+
+_HTML_RECORD = """
+<div class="{container_class}">
+    <div class="{header_class}">
+        {label}{levelname}: {message}{repeats}
+    </div>
+    <div class="error-time">Time: {time}</div>
+    <div class="error-location">
+        Location: {pathname}:{lineno} in {func_name}()
+    </div>
+"""
+
+_HTML_STACKTRACE = """
+    <div class="error-message">
+        <strong>Stack Trace:</strong>
+        <div class="stacktrace">{stacktrace}</div>
+    </div>
+"""
+
+_HTML_TAIL = """
+</body>
+</html>
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_time_cached(seconds):
+    """Format a whole-second timestamp; cached since log bursts share seconds."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(seconds))
+
+
+def send_alert(from_addr, to_addr, subject, body, pwdfile, smtp_server, smtp_port=587,
+               connection=None):
     """Send an email alert.
 
     Args:
@@ -21,21 +260,29 @@ def send_alert(from_addr, to_addr, subject, body, pwdfile, smtp_server, smtp_por
         pwdfile: Path to password file (relative to home directory)
         smtp_server: SMTP server address
         smtp_port: SMTP server port (default: 587)
+        connection: Optional SMTPConnection to reuse instead of opening a new
+            session (pwdfile, smtp_server and smtp_port are then ignored)
     """
-    pwd = Path.home().joinpath(pwdfile).read_text().strip()
-
-    msg = MIMEText(body)
-    msg["Subject"] = subject
+    msg = EmailMessage(policy=policy.SMTP)
+    # policy.SMTP rejects header values containing CR/LF
+    msg["Subject"] = " ".join(subject.splitlines())
     msg["From"] = from_addr
     msg["To"] = to_addr if isinstance(to_addr, str) else ", ".join(to_addr)
+    msg.set_content(body, charset="utf-8")
+
+    if connection is not None:
+        connection.send_message(msg)
+        return
 
+    pwd = _read_password(pwdfile)
     with smtplib.SMTP(smtp_server, smtp_port) as s:
         s.starttls()
         s.login(from_addr, pwd)
         s.send_message(msg)
 
 
-def send_html_alert(from_addr, to_addr, subject, html_body, pwdfile, smtp_server, smtp_port=587):
+def send_html_alert(from_addr, to_addr, subject, html_body, pwdfile, smtp_server, smtp_port=587,
+                    connection=None):
     """Send an email alert with HTML formatting.
 
     Args:
@@ -46,25 +293,29 @@ def send_html_alert(from_addr, to_addr, subject, html_body, pwdfile, smtp_server
         pwdfile: Path to password file (relative to home directory)
         smtp_server: SMTP server address
         smtp_port: SMTP server port (default: 587)
+        connection: Optional SMTPConnection to reuse instead of opening a new
+            session (pwdfile, smtp_server and smtp_port are then ignored)
     """
-    pwd = Path.home().joinpath(pwdfile).read_text().strip()
-
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
+    msg = EmailMessage(policy=policy.SMTP)
+    # policy.SMTP rejects header values containing CR/LF
+    msg["Subject"] = " ".join(subject.splitlines())
     msg["From"] = from_addr
     msg["To"] = to_addr if isinstance(to_addr, str) else ", ".join(to_addr)
 
-    # Attach HTML part
-    html_part = MIMEText(html_body, "html")
-    msg.attach(html_part)
+    msg.set_content(html_body, subtype="html", charset="utf-8")
+
+    if connection is not None:
+        connection.send_message(msg)
+        return
 
+    pwd = _read_password(pwdfile)
     with smtplib.SMTP(smtp_server, smtp_port) as s:
         s.starttls()
         s.login(from_addr, pwd)
         s.send_message(msg)
 
 
-class EmailHandler(logging.Handler):
+class EmailHandler(logging.handlers.BufferingHandler):
     """Logging handler that sends ERROR and above to email when script ends.
 
     Args:
@@ -79,7 +330,8 @@ class EmailHandler(logging.Handler):
 
     def __init__(self, from_addr, to_addr, subject_prefix, pwdfile, smtp_server,
                  smtp_port=587, max_batch_size=None):
-        super().__init__(level=logging.ERROR)
+        super().__init__(capacity=max_batch_size)
+        self.setLevel(logging.ERROR)
         self.from_addr = from_addr
         self.to_addr = to_addr
         self.subject_prefix = subject_prefix
@@ -88,50 +340,50 @@ class EmailHandler(logging.Handler):
         self.smtp_port = smtp_port
         self.max_batch_size = max_batch_size
 
-        # Batching
-        self.error_queue = deque()
-        self.batch_lock = threading.Lock()
+        # Read the password up front so a missing file fails here, not at exit
+        _read_password(pwdfile)
+
+        # Shared, persistent SMTP session so batches skip the TLS/AUTH handshake
+        self.connection = _pool.get(from_addr, pwdfile, smtp_server, smtp_port)
+
+        # Batching: records are buffered by BufferingHandler; full batches are
+        # sent on the shared worker pool so emit never waits on SMTP
+        self._pending = []
 
         # Auto-flush on program exit
         atexit.register(self.flush)
 
+    def shouldFlush(self, record):
+        """Send immediately only once max_batch_size is reached."""
+        return bool(self.max_batch_size) and len(self.buffer) >= self.capacity
+
     def emit(self, record):
-        """Collect log record for batched email sending."""
+        """Buffer log record for batched email sending."""
         try:
-            with self.batch_lock:
-                self.error_queue.append(record)
-
-                # Send immediately if batch size limit is reached
-                if self.max_batch_size and len(self.error_queue) >= self.max_batch_size:
-                    self._send_batch()
+            self.buffer.append(record)
+            if self.shouldFlush(record):
+                self._send_batch()
         except Exception:
             self.handleError(record)
 
-    def _send_batch(self, wait=False):
-        """Send batched errors as a single email.
-
-        Args:
-            wait: If True, wait for email to send before returning (for flush/close)
-        """
-        with self.batch_lock:
-            if not self.error_queue:
+    def _send_batch(self):
+        """Submit buffered records to the shared worker pool without waiting."""
+        with self.lock:
+            records, self.buffer = self.buffer, []
+            if not records:
                 return
+            try:
+                future = _get_executor().submit(self._send_email_batch, records)
+            except RuntimeError:
+                # Pool already shut down (interpreter exiting); send below
+                future = None
+            else:
+                self._pending = [f for f in self._pending if not f.done()]
+                self._pending.append(future)
 
-            # Collect all queued errors
-            records = list(self.error_queue)
-            self.error_queue.clear()
-
-            # Send in background thread
-            thread = threading.Thread(
-                target=self._send_email_batch,
-                args=(records,),
-                daemon=not wait  # Non-daemon if we need to wait
-            )
-            thread.start()
-
-            # Wait for completion if requested (e.g., during flush/close)
-            if wait:
-                thread.join(timeout=30)  # 30 second timeout for email sending
+        # Send on this thread without holding the lock, so other loggers aren't blocked
+        if future is None:
+            self._send_email_batch(records)
 
     def _send_email_batch(self, records):
         """Send the actual email (runs in background thread)."""
@@ -150,7 +402,8 @@ class EmailHandler(logging.Handler):
                 html_body=html_body,
                 pwdfile=self.pwdfile,
                 smtp_server=self.smtp_server,
-                smtp_port=self.smtp_port
+                smtp_port=self.smtp_port,
+                connection=self.connection
             )
         except Exception as e:
             # Log to stderr since we can't use the handler
@@ -158,89 +411,96 @@ class EmailHandler(logging.Handler):
 
     def _format_html_batch(self, records):
         """Format log records as HTML."""
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .error-container { margin: 20px 0; padding: 15px; border-left: 4px solid #d32f2f; background: #ffebee; }
-                .critical-container { margin: 20px 0; padding: 15px; border-left: 4px solid #b71c1c; background: #ffcdd2; }
-                .error-header { font-weight: bold; color: #d32f2f; margin-bottom: 10px; }
-                .critical-header { font-weight: bold; color: #b71c1c; margin-bottom: 10px; }
-                .error-time { color: #666; font-size: 0.9em; }
-                .error-location { color: #666; font-size: 0.9em; margin: 5px 0; }
-                .error-message { margin: 10px 0; padding: 10px; background: white; border-radius: 4px; }
-                .stacktrace { background: #263238; color: #aed581; padding: 15px; border-radius: 4px;
-                             overflow-x: auto; font-family: 'Courier New', monospace; font-size: 0.85em;
-                             white-space: pre-wrap; word-wrap: break-word; }
-                .summary { background: #e3f2fd; padding: 15px; border-radius: 4px; margin-bottom: 20px; }
-            </style>
-        </head>
-        <body>
-        """
+        parts = [_HTML_HEAD]
+        groups = self._group_records(records)
+        # Escaped tracebacks keyed by exception identity; records keep the exceptions alive
+        stacktraces = {}
 
         if len(records) > 1:
-            html += f"""
-            <div class="summary">
-                <strong>Summary:</strong> {len(records)} error(s) occurred<br>
-                <strong>Time Range:</strong> {self._format_time(records[0].created)} - {self._format_time(records[-1].created)}
-            </div>
-            """
-
-        for i, record in enumerate(records, 1):
-            container_class = "critical-container" if record.levelname == "CRITICAL" else "error-container"
-            header_class = "critical-header" if record.levelname == "CRITICAL" else "error-header"
-
-            html += f"""
-            <div class="{container_class}">
-                <div class="{header_class}">
-                    {"Error " + str(i) + " - " if len(records) > 1 else ""}{record.levelname}: {record.getMessage()}
-                </div>
-                <div class="error-time">Time: {self._format_time(record.created)}</div>
-                <div class="error-location">
-                    Location: {record.pathname}:{record.lineno} in {record.funcName}()
-                </div>
-            """
+            parts.append(_HTML_SUMMARY.format(
+                count=len(records),
+                unique=f" ({len(groups)} unique)" if len(groups) < len(records) else "",
+                start=self._format_time(records[0].created),
+                end=self._format_time(records[-1].created),
+            ))
+
+        for i, (record, count) in enumerate(groups, 1):
+            is_critical = record.levelname == "CRITICAL"
+            parts.append(_HTML_RECORD.format(
+                container_class="critical-container" if is_critical else "error-container",
+                header_class="critical-header" if is_critical else "error-header",
+                label=f"Error {i} - " if len(groups) > 1 else "",
+                levelname=record.levelname,
+                message=record.getMessage(),
+                repeats=f" (&times; {count})" if count > 1 else "",
+                time=self._format_time(record.created),
+                pathname=record.pathname,
+                lineno=record.lineno,
+                func_name=record.funcName,
+            ))
 
             if record.exc_info:
-                exc_text = ''.join(traceback.format_exception(*record.exc_info))
-                html += f"""
-                <div class="error-message">
-                    <strong>Stack Trace:</strong>
-                    <div class="stacktrace">{self._escape_html(exc_text)}</div>
-                </div>
-                """
-
-            html += "</div>"
-
-        html += """
-        </body>
-        </html>
-        """
-        return html
+                exc_key = id(record.exc_info[1])
+                if exc_key not in stacktraces:
+                    exc_text = self._clip_stacktrace(''.join(traceback.format_exception(*record.exc_info)))
+                    stacktraces[exc_key] = _HTML_STACKTRACE.format(stacktrace=self._escape_html(exc_text))
+                parts.append(stacktraces[exc_key])
+
+            parts.append("</div>")
+
+        parts.append(_HTML_TAIL)
+        return "".join(parts)
+
+    @staticmethod
+    def _group_records(records):
+        """Collapse identical errors into (first record, occurrence count) pairs, in order."""
+        groups = {}
+        for record in records:
+            key = (
+                record.levelno,
+                record.pathname,
+                record.lineno,
+                record.funcName,
+                record.getMessage(),
+                record.exc_info[0] if record.exc_info else None,
+            )
+            if key in groups:
+                groups[key][1] += 1
+            else:
+                groups[key] = [record, 1]
+        return [(record, count) for record, count in groups.values()]
+
+    @staticmethod
+    def _clip_stacktrace(text):
+        """Keep only the start and the innermost frames of an overly long traceback."""
+        if len(text) <= _MAX_STACKTRACE_CHARS:
+            return text
+        lines = text.splitlines()
+        if len(lines) <= _STACKTRACE_HEAD_LINES + _STACKTRACE_TAIL_LINES:
+            return text
+        return "\n".join(
+            lines[:_STACKTRACE_HEAD_LINES]
+            + ["... (truncated)"]
+            + lines[-_STACKTRACE_TAIL_LINES:]
+        ) + "\n"
 
     @staticmethod
     def _format_time(timestamp):
         """Format timestamp as readable string."""
-        return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        return _format_time_cached(int(timestamp))
 
     @staticmethod
     def _escape_html(text):
         """Escape HTML special characters."""
-        return (text
-                .replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace('"', "&quot;")
-                .replace("'", "&#39;"))
+        return html.escape(text, quote=True)
 
     def flush(self):
         """Flush any pending errors immediately."""
-        if self.error_queue:
-            self._send_batch(wait=True)
-
-    def close(self):
-        """Close handler and flush any pending errors."""
-        self.flush()
-        super().close()
+        with self.lock:
+            records, self.buffer = self.buffer, []
+            pending, self._pending = self._pending, []
+
+        # 30 second timeout for in-flight batches, then send the rest here
+        concurrent.futures.wait(pending, timeout=30)
+        if records:
+            self._send_email_batch(records)
@@ -1,7 +1,91 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Sequence, Tuple
 import logging
 
 
+# Marks a path that does not exist in the post object
+_MISSING = object()
+
+# Compiled forms of recently used plain path mappings, keyed by id(). Each entry
+# holds the mapping itself (so the id can't be reused) and a copy of its
+# contents (so later mutation is detected and triggers a recompile).
+_COMPILED_CACHE_SIZE = 8
+_compiled_cache = {}
+
+
+class CompiledPaths(Dict[str, List[Tuple[str, ...]]]):
+    """Attribute paths pre-split into key tuples, as built by `compile_post_attr_paths`."""
+
+
+def compile_post_attr_paths(post_attr_paths: Dict[str, List[str]]) -> CompiledPaths:
+    """Pre-split dotted attribute paths so they can be reused across many posts.
+
+    Args:
+        post_attr_paths: A mapping of attribute names to lists of possible
+            dotted dictionary paths within the post object.
+
+    Returns:
+        A CompiledPaths mapping each attribute name to a list of key tuples,
+        accepted anywhere `post_attr_paths` is.
+    """
+    return CompiledPaths(
+        (_attr, [tuple(_path.split(".")) for _path in _paths])
+        for _attr, _paths in post_attr_paths.items()
+    )
+
+
+def _compiled_for(post_attr_paths: Dict[str, List[str]]) -> CompiledPaths:
+    """Return post_attr_paths compiled, reusing the result while the mapping is unchanged."""
+    if isinstance(post_attr_paths, CompiledPaths):
+        return post_attr_paths
+    _entry = _compiled_cache.get(id(post_attr_paths))
+    if _entry is not None and _entry[0] is post_attr_paths and _entry[1] == post_attr_paths:
+        return _entry[2]
+
+    _compiled = compile_post_attr_paths(post_attr_paths)
+    if len(_compiled_cache) >= _COMPILED_CACHE_SIZE:
+        _compiled_cache.clear()
+    # Copy each value as its own type (list, tuple, ...) so the snapshot compares equal
+    _snapshot = {_attr: type(_paths)(_paths) for _attr, _paths in post_attr_paths.items()}
+    _compiled_cache[id(post_attr_paths)] = (post_attr_paths, _snapshot, _compiled)
+    return _compiled
+
+
+def _unwrap_post(post_obj: dict) -> dict:
+    """Strip any TweetWithVisibilityResults wrappers around the tweet info."""
+    while post_obj.get("__typename") == "TweetWithVisibilityResults":
+        post_obj = post_obj.get("tweet", {})
+    return post_obj
+
+
+def _walk_paths(post_obj: dict, paths: Iterable[Sequence[str]], dotted: bool = False):
+    """Follow each path through post_obj and return the value found, or None.
+
+    Paths are sequences of keys, or dotted strings split here when `dotted` is set.
+
+    Raises:
+        AssertionError: If multiple paths return conflicting values.
+    """
+    _values = list()
+    for _path in paths:
+        if dotted:
+            _path = _path.split(".")
+        _cursor = post_obj
+        for _part in _path:
+            _cursor = _cursor.get(_part, _MISSING)
+            if _cursor is _MISSING:
+                break
+        if _cursor is _MISSING or isinstance(_cursor, dict):
+            continue
+        _values.append(_cursor)
+
+    if not _values:
+        return None
+
+    assert len(set(_values)) == 1
+    _value = _values[0]
+    return _value
+
+
 def get_post_attr(post_obj: dict, attr: str, post_attr_paths: Dict[str, List[str]]):
     """Extract a single attribute from a Twitter/X post object.
 
@@ -16,7 +100,8 @@ def get_post_attr(post_obj: dict, attr: str, post_attr_paths: Dict[str, List[str
         post_obj: A dictionary representing a Tweet or TweetWithVisibilityResults object.
         attr: The attribute name to extract (e.g., "text", "post_id", "lang").
         post_attr_paths: A mapping of attribute names to lists of possible
-            dictionary paths within the post object.
+            dictionary paths within the post object, or the result of
+            `compile_post_attr_paths`.
 
     Returns:
         The extracted attribute value, or None if not found or attr is unknown.
@@ -25,30 +110,46 @@ def get_post_attr(post_obj: dict, attr: str, post_attr_paths: Dict[str, List[str
         AssertionError: If post_obj is not a recognized tweet type, or if
             multiple paths return conflicting values (except for "text").
     """
+    if isinstance(post_attr_paths, CompiledPaths):
+        return get_post_attr_compiled(post_obj, attr, post_attr_paths)
     if attr == "__typename":
         return post_obj.get("__typename")
-    # TweetWithVisibilityResults has a wrapper around tweet info
-    while post_obj.get("__typename") == "TweetWithVisibilityResults":
-        post_obj = post_obj.get("tweet", {})
+    post_obj = _unwrap_post(post_obj)
     if attr not in post_attr_paths:
         logging.warning(f"Unkown attr '{attr}'; skipping extraction.")
         return None
 
-    _values = list()
-    for _path in post_attr_paths[attr]:
-        _path = _path.split(".")
-        _cursor = post_obj
-        for _part in _path:
-            _cursor = _cursor.get(_part, {})
-        if type(_cursor) is not dict:
-            _values.append(_cursor)
+    return _walk_paths(post_obj, post_attr_paths[attr], dotted=True)
 
-    if not _values:
+
+def get_post_attr_compiled(post_obj: dict, attr: str, compiled_paths: CompiledPaths):
+    """Extract a single attribute from a Twitter/X post object using compiled paths.
+
+    Same as `get_post_attr`, but takes paths already split by
+    `compile_post_attr_paths` so no string splitting happens per call.
+
+    Args:
+        post_obj: A dictionary representing a Tweet or TweetWithVisibilityResults object.
+        attr: The attribute name to extract (e.g., "text", "post_id", "lang").
+        compiled_paths: Attribute paths as returned by `compile_post_attr_paths`.
+
+    Returns:
+        The extracted attribute value, or None if not found or attr is unknown.
+
+    Raises:
+        TypeError: If compiled_paths was not built by `compile_post_attr_paths`.
+        AssertionError: If multiple paths return conflicting values.
+    """
+    if not isinstance(compiled_paths, CompiledPaths):
+        raise TypeError("compiled_paths must be built with compile_post_attr_paths()")
+    if attr == "__typename":
+        return post_obj.get("__typename")
+    post_obj = _unwrap_post(post_obj)
+    if attr not in compiled_paths:
+        logging.warning(f"Unkown attr '{attr}'; skipping extraction.")
         return None
 
-    assert len(set(_values)) == 1
-    _value = _values[0]
-    return _value
+    return _walk_paths(post_obj, compiled_paths[attr])
 
 
 def get_post_attrs(post_obj: dict, post_attr_paths: Dict[str, List[str]]):
@@ -57,7 +158,9 @@ def get_post_attrs(post_obj: dict, post_attr_paths: Dict[str, List[str]]):
     Args:
         post_obj: A dictionary representing a tweet object.
         post_attr_paths: A mapping of attribute names to lists of possible
-            dictionary paths within the post object. Format is: 
+            dictionary paths within the post object, or the result of
+            `compile_post_attr_paths` (recommended when processing many
+            posts). Format is:
                 {
                     "attr_name_1": ["path.to.attr1.option1", "path.to.attr1.option2"],
                     "attr_name_2": ["path.to.attr2.option1"],
@@ -67,8 +170,17 @@ def get_post_attrs(post_obj: dict, post_attr_paths: Dict[str, List[str]]):
     Returns:
         A dictionary mapping each requested attribute name to its extracted value.
     """
-    _results = {}
-    for _attr in post_attr_paths.keys():
-        _results[_attr] = get_post_attr(post_obj, _attr, post_attr_paths)
+    post_attr_paths = _compiled_for(post_attr_paths)
+
+    # Unwrap once up front rather than once per attribute
+    _inner = _unwrap_post(post_obj)
+    _results = {
+        _attr: _walk_paths(_inner, _paths)
+        for _attr, _paths in post_attr_paths.items()
+    }
+    # __typename comes from the outer (possibly wrapped) object; overwriting
+    # keeps the caller's key order
+    if "__typename" in post_attr_paths:
+        _results["__typename"] = post_obj.get("__typename")
 
     return _results